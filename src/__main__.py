@@ -3,13 +3,25 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
 import json
 import sys
 from pathlib import Path
 
-from .cross_reference import ReferenceIndex, build_from_studies
+from .cross_reference import (
+    PartialIndex,
+    ReferenceIndex,
+    build_from_studies,
+    merge_partials,
+    parse_shard_spec,
+    shard_of,
+    snippet,
+)
+from .events import BatchResult, EventConsumer, load_subscriptions
 from .export import to_evidence_checklist, to_markdown_outline, to_summary
-from .parser import parse_markdown
+from .parser import CaseStudy, LazyCaseStudy, parse_markdown
+from .related import DEFAULT_MAX_DF, DEFAULT_MAX_POSTINGS, METRICS, related_studies
+from .site_builder import build_site
 
 
 def cmd_parse(args: argparse.Namespace) -> None:
@@ -25,39 +37,296 @@ def cmd_parse(args: argparse.Namespace) -> None:
     print(json.dumps(summary, indent=2))
 
 
+def _print_index(
+    index: ReferenceIndex,
+    titles: list[str],
+    show_positions: bool = False,
+    studies: dict[str, CaseStudy] | None = None,
+) -> None:
+    """Print a cross-reference index, its orphans, and graph size.
+
+    With show_positions, each reference is followed by the section and
+    line of every match, plus a snippet when the source study is given.
+    """
+    print(f"\n--- Cross-Reference Index ({len(titles)} studies) ---")
+    for ref_id, ref in enumerate(index.references):
+        print(f"  {ref.source} -> {ref.target} [{ref.relationship}]")
+        if not show_positions:
+            continue
+        study = studies.get(ref.source) if studies else None
+        for position in index.locate(ref_id):
+            location = f"    {position.section}, line {position.line}"
+            if study is not None:
+                location += f": {snippet(study, position)}"
+            print(location)
+
+    orphans = index.get_orphan_titles(titles)
+    if orphans:
+        print(f"\nOrphan studies (no cross-references): {len(orphans)}")
+        for orphan in orphans:
+            print(f"  - {orphan}")
+    else:
+        print("\nNo orphan studies — all studies have cross-references.")
+
+    graph = index.get_reference_graph()
+    print(f"\nReference graph: {len(graph)} source nodes")
+
+
+def _reduce_partials(paths: list[str]) -> tuple[ReferenceIndex, list[str]]:
+    """Load partial index files and merge them, exiting on bad input."""
+    partials = []
+    for partial_path in paths:
+        path = Path(partial_path)
+        if not path.exists():
+            print(f"Error: file not found: {path}", file=sys.stderr)
+            sys.exit(1)
+        try:
+            partials.append(PartialIndex.from_dict(json.loads(path.read_text(encoding="utf-8"))))
+        except (json.JSONDecodeError, KeyError, TypeError):
+            print(f"Error: {path} is not a partial index", file=sys.stderr)
+            sys.exit(1)
+
+    try:
+        return merge_partials(partials)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
 def cmd_analyze(args: argparse.Namespace) -> None:
-    """Parse all case studies in a directory, show cross-reference index."""
+    """Parse all case studies in a directory, show cross-reference index.
+
+    With --shard i/N, only the files assigned to shard i are parsed and a
+    partial index is written to --output. With --reduce, previously
+    written partial indexes are merged instead of parsing any files.
+    """
+    if args.reduce:
+        index, titles = _reduce_partials(args.reduce)
+        print(f"Merged {len(args.reduce)} partial indexes")
+        if args.output:
+            Path(args.output).write_text(json.dumps(index.to_dict(), indent=2), encoding="utf-8")
+        _print_index(index, titles, show_positions=args.positions)
+        return
+
+    if args.directory is None:
+        print("Error: a directory is required unless --reduce is given", file=sys.stderr)
+        sys.exit(1)
+
     directory = Path(args.directory)
     if not directory.is_dir():
         print(f"Error: not a directory: {directory}", file=sys.stderr)
         sys.exit(1)
 
+    shard, num_shards = 0, 1
+    if args.shard:
+        try:
+            shard, num_shards = parse_shard_spec(args.shard)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        if not args.output:
+            print("Error: --shard requires --output", file=sys.stderr)
+            sys.exit(1)
+
     studies = []
     for md_file in sorted(directory.glob("*.md")):
+        if shard_of(md_file.relative_to(directory).as_posix(), num_shards) != shard:
+            continue
         text = md_file.read_text(encoding="utf-8")
         study = parse_markdown(text)
         studies.append(study)
         print(f"Parsed: {study.title} ({study.word_count} words, {len(study.sections)} sections)")
 
+    index = build_from_studies(studies)
+
+    if args.shard:
+        partial = PartialIndex(
+            shard=shard,
+            num_shards=num_shards,
+            root=args.root or directory.as_posix(),
+            studies=[s.title for s in studies],
+            index=index,
+        )
+        Path(args.output).write_text(json.dumps(partial.to_dict(), indent=2), encoding="utf-8")
+        print(f"\nWrote partial index for shard {shard}/{num_shards} to {args.output}")
+        return
+
     if not studies:
         print("No markdown files found.", file=sys.stderr)
         sys.exit(1)
 
-    print(f"\n--- Cross-Reference Index ({len(studies)} studies) ---")
-    index = build_from_studies(studies)
-    for ref in index.references:
-        print(f"  {ref.source} -> {ref.target} [{ref.relationship}]")
+    if args.output:
+        Path(args.output).write_text(json.dumps(index.to_dict(), indent=2), encoding="utf-8")
+    _print_index(
+        index,
+        [s.title for s in studies],
+        show_positions=args.positions,
+        studies={s.title: s for s in studies},
+    )
 
-    orphans = index.get_orphan_studies(studies)
-    if orphans:
-        print(f"\nOrphan studies (no cross-references): {len(orphans)}")
-        for orphan in orphans:
-            print(f"  - {orphan.title}")
+
+def cmd_related(args: argparse.Namespace) -> None:
+    """Recommend related studies by shared cross-reference targets.
+
+    The source may be a directory of studies, an index written by
+    analyze --output, or results cached by a previous related --output,
+    which are reused as long as they were computed with the same -k,
+    --metric, --max-df and --max-postings.
+    """
+    source = Path(args.source)
+    max_df = args.max_df if args.max_df > 0 else None
+    max_postings = args.max_postings if args.max_postings > 0 else None
+    settings = {
+        "metric": args.metric, "k": args.k, "max_df": max_df, "max_postings": max_postings,
+    }
+    related = None
+    if source.is_dir():
+        studies = [
+            parse_markdown(md_file.read_text(encoding="utf-8"))
+            for md_file in sorted(source.glob("*.md"))
+        ]
+        index = build_from_studies(studies)
+    elif source.is_file():
+        payload = json.loads(source.read_text(encoding="utf-8"))
+        if "shard" in payload:
+            print(
+                f"Error: {source} is a partial index; merge shards with "
+                "analyze --reduce ... --output first",
+                file=sys.stderr,
+            )
+            sys.exit(1)
+        if "related" in payload:
+            cached = {key: payload.get(key) for key in settings}
+            if cached != settings:
+                print(
+                    f"Error: {source} was computed with {cached}, not {settings}",
+                    file=sys.stderr,
+                )
+                sys.exit(1)
+            related = {
+                title: [(other, score) for other, score in neighbours]
+                for title, neighbours in payload["related"].items()
+            }
+        else:
+            index = ReferenceIndex.from_dict(payload)
     else:
-        print("\nNo orphan studies — all studies have cross-references.")
+        print(f"Error: not a directory or index file: {source}", file=sys.stderr)
+        sys.exit(1)
 
-    graph = index.get_reference_graph()
-    print(f"\nReference graph: {len(graph)} source nodes")
+    if related is None:
+        related = related_studies(
+            index, k=args.k, metric=args.metric, max_df=max_df, max_postings=max_postings,
+        )
+        if args.output:
+            payload = {**settings, "related": related}
+            Path(args.output).write_text(json.dumps(payload, indent=2), encoding="utf-8")
+
+    if args.study:
+        if args.study not in related:
+            print(f"Error: no references found for study: {args.study}", file=sys.stderr)
+            sys.exit(1)
+        related = {args.study: related[args.study]}
+
+    for title, neighbours in related.items():
+        print(title)
+        for other, score in neighbours:
+            print(f"  {score:.3f}  {other}")
+        if not neighbours:
+            print("  (no related studies)")
+
+
+def cmd_list(args: argparse.Namespace) -> None:
+    """List case studies in a directory using only their frontmatter.
+
+    Also serves the filter command: any of --organ, --status and --repo
+    that are set must match the study's metadata exactly.
+    """
+    directory = Path(args.directory)
+    if not directory.is_dir():
+        print(f"Error: not a directory: {directory}", file=sys.stderr)
+        sys.exit(1)
+
+    filters = {
+        key: value
+        for key in ("organ", "status", "repo")
+        if (value := getattr(args, key, None)) is not None
+    }
+
+    count = 0
+    for md_file in sorted(directory.glob("*.md")):
+        study = LazyCaseStudy(md_file)
+        fields = {
+            "organ": study.organ,
+            "status": study.status,
+            "repo": study.metadata.get("repo", ""),
+        }
+        if any(fields[key] != value for key, value in filters.items()):
+            continue
+        count += 1
+        date = study.metadata.get("date", "")
+        print(f"{md_file.name}\t{study.organ}\t{study.status}\t{date}\t{study.title}")
+
+    print(f"{count} studies", file=sys.stderr)
+
+
+def cmd_site(args: argparse.Namespace) -> None:
+    """Build the static HTML site, re-rendering only changed pages."""
+    directory = Path(args.directory)
+    if not directory.is_dir():
+        print(f"Error: not a directory: {directory}", file=sys.stderr)
+        sys.exit(1)
+
+    result = build_site(directory, args.output, jobs=args.jobs, force=args.force)
+    for path in result.rendered:
+        print(f"Rendered: {path}")
+    for path in result.removed:
+        print(f"Removed: {path}")
+    print(
+        f"\n{len(result.rendered)} rendered, {len(result.skipped)} up to date, "
+        f"{len(result.removed)} removed -> {args.output}"
+    )
+
+
+def _print_batch(result: BatchResult) -> None:
+    events = ", ".join(sorted({event.event for event in result.events})) or "none"
+    print(f"Batch of {len(result.events)} events ({events}): "
+          f"{len(result.studies)} studies revalidated")
+    for name in result.studies:
+        problems = result.problems[name]
+        status = f"{len(problems)} problems" if problems else "OK"
+        print(f"  {name}: {status}")
+
+
+def cmd_watch(args: argparse.Namespace) -> None:
+    """Revalidate affected case studies as subscription events arrive."""
+    directory = Path(args.directory)
+    spool = Path(args.spool)
+    for path in (directory, spool):
+        if not path.is_dir():
+            print(f"Error: not a directory: {path}", file=sys.stderr)
+            sys.exit(1)
+    seed = Path(args.seed)
+    if not seed.exists():
+        print(f"Error: file not found: {seed}", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        consumer = EventConsumer(
+            directory,
+            spool,
+            args.output,
+            load_subscriptions(seed),
+            debounce=args.debounce,
+            max_batch=args.max_batch,
+            workers=args.workers,
+        )
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    try:
+        asyncio.run(consumer.run(once=args.once, on_batch=_print_batch))
+    except KeyboardInterrupt:
+        pass
 
 
 def cmd_checklist(args: argparse.Namespace) -> None:
@@ -113,7 +382,120 @@ def main() -> None:
 
     # analyze command
     analyze_parser = subparsers.add_parser("analyze", help="Analyze all case studies in a directory")
-    analyze_parser.add_argument("directory", help="Path to directory of case study files")
+    analyze_parser.add_argument(
+        "directory", nargs="?", help="Path to directory of case study files"
+    )
+    analyze_parser.add_argument(
+        "--shard",
+        metavar="I/N",
+        help="Only analyze shard I of N (zero-based) and write a partial index",
+    )
+    analyze_parser.add_argument(
+        "--reduce",
+        nargs="+",
+        metavar="PARTIAL",
+        help="Merge partial index files written by --shard instead of parsing",
+    )
+    analyze_parser.add_argument("--output", help="Write the (partial) index as JSON to this path")
+    analyze_parser.add_argument(
+        "--root",
+        help="Label identifying the corpus tree in a partial index; shards of the same "
+        "tree must share it (default: the directory as given)",
+    )
+    analyze_parser.add_argument(
+        "--positions",
+        action="store_true",
+        help="Show the section, line and surrounding text of every reference",
+    )
+
+    # related command
+    related_parser = subparsers.add_parser("related", help="Recommend related case studies")
+    related_parser.add_argument(
+        "source",
+        help="Directory of case study files, an index JSON from analyze --output, "
+        "or cached results from related --output",
+    )
+    related_parser.add_argument("-k", type=int, default=5, help="Neighbours per study (default: 5)")
+    related_parser.add_argument(
+        "--metric",
+        choices=list(METRICS),
+        default="jaccard",
+        help="Similarity metric (default: jaccard)",
+    )
+    related_parser.add_argument(
+        "--max-df",
+        type=float,
+        default=DEFAULT_MAX_DF,
+        help="Ignore targets referenced by more than this fraction of studies, which keeps "
+        f"scoring from going all-pairs on hub targets like organs (default: {DEFAULT_MAX_DF}; "
+        "0 disables)",
+    )
+    related_parser.add_argument(
+        "--max-postings",
+        type=int,
+        default=DEFAULT_MAX_POSTINGS,
+        help="Ignore targets referenced by more than this many studies "
+        f"(default: {DEFAULT_MAX_POSTINGS}; 0 disables)",
+    )
+    related_parser.add_argument("--study", help="Only show neighbours of this study title")
+    related_parser.add_argument(
+        "--output", help="Cache the results as JSON; pass the file back as source to reuse them"
+    )
+
+    # list command
+    list_parser = subparsers.add_parser("list", help="List case studies from frontmatter only")
+    list_parser.add_argument("directory", help="Path to directory of case study files")
+
+    # filter command
+    filter_parser = subparsers.add_parser(
+        "filter", help="List case studies whose frontmatter matches all given filters"
+    )
+    filter_parser.add_argument("directory", help="Path to directory of case study files")
+    filter_parser.add_argument("--organ", help="Organ numeral, e.g. II")
+    filter_parser.add_argument("--status", help="Status, e.g. published (missing means draft)")
+    filter_parser.add_argument("--repo", help="Repository, e.g. organvm-ii-poiesis/metasystem-master")
+
+    # site command
+    site_parser = subparsers.add_parser("site", help="Build a static HTML site of case studies")
+    site_parser.add_argument("directory", help="Path to directory of case study files")
+    site_parser.add_argument("--output", default="site", help="Output directory (default: site)")
+    site_parser.add_argument(
+        "--jobs", type=int, default=1, help="Worker processes for rendering (default: 1)"
+    )
+    site_parser.add_argument(
+        "--force", action="store_true", help="Re-render every page, ignoring the manifest"
+    )
+
+    # watch command
+    watch_parser = subparsers.add_parser(
+        "watch", help="Revalidate affected studies when subscription events arrive"
+    )
+    watch_parser.add_argument("directory", help="Path to directory of case study files")
+    watch_parser.add_argument("--spool", required=True, help="Directory to read event files from")
+    watch_parser.add_argument(
+        "--output", default="revalidation", help="Directory for per-study reports"
+    )
+    watch_parser.add_argument(
+        "--seed", default="seed.yaml", help="seed.yaml declaring subscriptions (default: seed.yaml)"
+    )
+    watch_parser.add_argument(
+        "--debounce",
+        type=float,
+        default=1.0,
+        help="Seconds of quiet that close a batch of events (default: 1.0)",
+    )
+    watch_parser.add_argument(
+        "--workers", type=int, default=4, help="Maximum concurrent revalidations (default: 4)"
+    )
+    watch_parser.add_argument(
+        "--max-batch",
+        type=int,
+        default=1000,
+        help="Maximum event files taken into one batch (default: 1000)",
+    )
+    watch_parser.add_argument(
+        "--once", action="store_true", help="Process the events already spooled, then exit"
+    )
 
     # checklist command
     checklist_parser = subparsers.add_parser("checklist", help="Generate evidence checklist")
@@ -134,6 +516,11 @@ def main() -> None:
     commands = {
         "parse": cmd_parse,
         "analyze": cmd_analyze,
+        "related": cmd_related,
+        "list": cmd_list,
+        "filter": cmd_list,
+        "site": cmd_site,
+        "watch": cmd_watch,
         "checklist": cmd_checklist,
         "export": cmd_export,
     }
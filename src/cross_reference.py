@@ -3,7 +3,10 @@
 from __future__ import annotations
 
 import re
-from dataclasses import dataclass, field
+import zlib
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import asdict, dataclass, field
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -19,14 +22,132 @@ class CrossReference:
     context: str = ""
 
 
+@dataclass(frozen=True)
+class ReferencePosition:
+    """Where a reference occurs: section, byte offset, and line.
+
+    ``ordinal`` is the section's index in CaseStudy.sections (headings
+    need not be unique); ``section`` is its heading, for display.
+    ``offset`` is in UTF-8 bytes from the start of the section content
+    and ``length`` is the match's length in bytes; ``line`` is the
+    1-based line in the source document.
+    """
+    section: str
+    ordinal: int
+    offset: int
+    line: int
+    length: int = 0
+
+
+@dataclass
+class ReferencePositions:
+    """Columnar store of every match behind the references in an index.
+
+    Each row is one match; ``ref`` holds the index of the reference in
+    ReferenceIndex.references, ``section`` an index into the shared
+    ``sections`` heading table, and ``ordinal`` the section's position
+    within its study. Rows are kept sorted by ``ref`` so the
+    positions of a reference can be found by bisection.
+    """
+    sections: list[str] = field(default_factory=list)
+    ref: array = field(default_factory=lambda: array("I"))
+    section: array = field(default_factory=lambda: array("I"))
+    ordinal: array = field(default_factory=lambda: array("I"))
+    offset: array = field(default_factory=lambda: array("Q"))
+    line: array = field(default_factory=lambda: array("I"))
+    length: array = field(default_factory=lambda: array("I"))
+    _section_ids: dict[str, int] = field(
+        default_factory=dict, init=False, repr=False, compare=False,
+    )
+
+    def __post_init__(self) -> None:
+        self._section_ids = {heading: i for i, heading in enumerate(self.sections)}
+
+    def __len__(self) -> int:
+        return len(self.ref)
+
+    def _section_id(self, heading: str) -> int:
+        section_id = self._section_ids.get(heading)
+        if section_id is None:
+            section_id = self._section_ids[heading] = len(self.sections)
+            self.sections.append(heading)
+        return section_id
+
+    def append(
+        self, ref: int, section: str, ordinal: int, offset: int, line: int, length: int,
+    ) -> None:
+        if self.ref and ref < self.ref[-1]:
+            raise ValueError(f"positions must be appended in reference order (got {ref})")
+        self.ref.append(ref)
+        self.section.append(self._section_id(section))
+        self.ordinal.append(ordinal)
+        self.offset.append(offset)
+        self.line.append(line)
+        self.length.append(length)
+
+    def for_reference(self, ref: int) -> list[ReferencePosition]:
+        lo = bisect_left(self.ref, ref)
+        hi = bisect_right(self.ref, ref, lo)
+        return [
+            ReferencePosition(
+                self.sections[self.section[i]], self.ordinal[i], self.offset[i], self.line[i],
+                self.length[i],
+            )
+            for i in range(lo, hi)
+        ]
+
+    def extend(self, other: ReferencePositions, ref_offset: int) -> None:
+        """Append another store's rows, shifting their reference ids by ref_offset."""
+        section_map = [self._section_id(heading) for heading in other.sections]
+        self.ref.extend(r + ref_offset for r in other.ref)
+        self.section.extend(section_map[s] for s in other.section)
+        self.ordinal.extend(other.ordinal)
+        self.offset.extend(other.offset)
+        self.line.extend(other.line)
+        self.length.extend(other.length)
+
+    def to_dict(self) -> dict:
+        return {
+            "sections": list(self.sections),
+            "ref": self.ref.tolist(),
+            "section": self.section.tolist(),
+            "ordinal": self.ordinal.tolist(),
+            "offset": self.offset.tolist(),
+            "line": self.line.tolist(),
+            "length": self.length.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> ReferencePositions:
+        return cls(
+            sections=list(data.get("sections", [])),
+            ref=array("I", data.get("ref", [])),
+            section=array("I", data.get("section", [])),
+            ordinal=array("I", data.get("ordinal", [])),
+            offset=array("Q", data.get("offset", [])),
+            line=array("I", data.get("line", [])),
+            length=array("I", data.get("length", [])),
+        )
+
+
 @dataclass
 class ReferenceIndex:
     """Index of cross-references across case studies."""
     references: list[CrossReference] = field(default_factory=list)
+    positions: ReferencePositions = field(default_factory=ReferencePositions)
 
     def add(self, ref: CrossReference) -> None:
         self.references.append(ref)
 
+    def merge(self, other: ReferenceIndex) -> None:
+        """Append every reference (and its positions) from another index into this one."""
+        self.positions.extend(other.positions, ref_offset=len(self.references))
+        self.references.extend(other.references)
+
+    def locate(self, ref_id: int) -> list[ReferencePosition]:
+        """Return every position at which references[ref_id] was found."""
+        return self.positions.for_reference(ref_id)
+
     def find_by_source(self, source: str) -> list[CrossReference]:
         return [r for r in self.references if r.source == source]
 
@@ -67,17 +188,182 @@ class ReferenceIndex:
         source_titles = self.unique_sources
         return [s for s in studies if s.title not in source_titles]
 
+    def get_orphan_titles(self, titles: list[str]) -> list[str]:
+        """Like get_orphan_studies, but for bare titles (e.g. from partial indexes)."""
+        source_titles = self.unique_sources
+        return [t for t in titles if t not in source_titles]
+
+    def to_dict(self) -> dict:
+        """Serialize the index to a JSON-compatible dict."""
+        return {
+            "references": [asdict(r) for r in self.references],
+            "positions": self.positions.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> ReferenceIndex:
+        """Rebuild an index from the output of to_dict."""
+        return cls(
+            references=[CrossReference(**r) for r in data.get("references", [])],
+            positions=ReferencePositions.from_dict(data.get("positions", {})),
+        )
+
+
+@dataclass
+class PartialIndex:
+    """The result of analyzing one shard of a corpus.
+
+    Carries the titles of every study in the shard alongside its index,
+    so orphan detection can be done after all shards are merged.
+    ``root`` is a stable label for the corpus tree (not a machine-specific
+    path), so shards of one tree produced on different hosts still merge
+    under the same duplicate and completeness checks.
+    """
+    shard: int
+    num_shards: int
+    root: str = ""
+    studies: list[str] = field(default_factory=list)
+    index: ReferenceIndex = field(default_factory=ReferenceIndex)
+
+    def to_dict(self) -> dict:
+        return {
+            "shard": self.shard,
+            "num_shards": self.num_shards,
+            "root": self.root,
+            "studies": list(self.studies),
+            "index": self.index.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> PartialIndex:
+        return cls(
+            shard=data["shard"],
+            num_shards=data["num_shards"],
+            root=data.get("root", ""),
+            studies=list(data.get("studies", [])),
+            index=ReferenceIndex.from_dict(data.get("index", {})),
+        )
+
+
+def parse_shard_spec(spec: str) -> tuple[int, int]:
+    """Parse a shard spec like "0/4" into (shard, num_shards).
+
+    Shards are zero-based: "i/N" requires 0 <= i < N.
+    """
+    shard_str, sep, total_str = spec.partition("/")
+    try:
+        shard, num_shards = int(shard_str), int(total_str)
+    except ValueError:
+        raise ValueError(f"invalid shard spec: {spec!r} (expected i/N)") from None
+    if not sep or num_shards < 1 or not 0 <= shard < num_shards:
+        raise ValueError(f"invalid shard spec: {spec!r} (expected 0 <= i < N)")
+    return shard, num_shards
+
+
+def shard_of(key: str, num_shards: int) -> int:
+    """Assign a key (typically a relative file path) to a shard.
+
+    Uses a stable CRC32 hash, so assignments are identical across machines
+    and do not shift when unrelated files are added to the corpus.
+    """
+    return zlib.crc32(key.encode("utf-8")) % num_shards
+
+
+def merge_partials(partials: list[PartialIndex]) -> tuple[ReferenceIndex, list[str]]:
+    """Merge partial indexes into a full index plus the combined study titles.
+
+    Partials from different roots (e.g. one tree per org) merge freely.
+    Within a root, raises ValueError if the partials disagree on the
+    shard count, the same shard appears more than once, or any of the
+    shards 0..N-1 is missing.
+    """
+    index = ReferenceIndex()
+    titles: list[str] = []
+    shard_counts: dict[str, int] = {}
+    seen: set[tuple[str, int]] = set()
+
+    for partial in sorted(partials, key=lambda p: (p.root, p.shard)):
+        expected = shard_counts.setdefault(partial.root, partial.num_shards)
+        if partial.num_shards != expected:
+            raise ValueError(
+                f"partials for {partial.root!r} disagree on shard count: "
+                f"{expected} vs {partial.num_shards}"
+            )
+        key = (partial.root, partial.shard)
+        if key in seen:
+            raise ValueError(
+                f"duplicate shard {partial.shard}/{partial.num_shards} for {partial.root!r}"
+            )
+        seen.add(key)
+        index.merge(partial.index)
+        titles.extend(partial.studies)
+
+    for root, num_shards in shard_counts.items():
+        missing = [i for i in range(num_shards) if (root, i) not in seen]
+        if missing:
+            raise ValueError(
+                f"missing shards for {root!r}: "
+                + ", ".join(f"{i}/{num_shards}" for i in missing)
+            )
+
+    return index, titles
+
+
+REPO_PATTERN = re.compile(r'`([a-z][a-z0-9-]*(?:--[a-z0-9-]+)?)`')
+ORGAN_PATTERN = re.compile(r'ORGAN[-\s]([IV]+)')
+
 
 def extract_repo_references(text: str) -> list[str]:
     """Extract repository name references from backtick-quoted text."""
-    pattern = r'`([a-z][a-z0-9-]*(?:--[a-z0-9-]+)?)`'
-    return sorted(set(re.findall(pattern, text)))
+    return sorted(set(REPO_PATTERN.findall(text)))
 
 
 def extract_organ_references(text: str) -> list[str]:
     """Extract ORGAN references (e.g. ORGAN-I, ORGAN-IV) from text."""
-    pattern = r'ORGAN[-\s]([IV]+)'
-    return sorted(set(re.findall(pattern, text)))
+    return sorted(set(ORGAN_PATTERN.findall(text)))
+
+
+def _find_positions(
+    study: CaseStudy, pattern: re.Pattern[str],
+) -> dict[str, list[tuple[str, int, int, int, int]]]:
+    """Map each match of pattern to its (heading, ordinal, offset, line, length) positions."""
+    found: dict[str, list[tuple[str, int, int, int, int]]] = {}
+    for ordinal, section in enumerate(study.sections):
+        content = section.content
+        pos = byte_offset = 0
+        line = section.line
+        for match in pattern.finditer(content):
+            start = match.start()
+            chunk = content[pos:start]
+            byte_offset += len(chunk.encode("utf-8"))
+            line += chunk.count("\n")
+            pos = start
+            found.setdefault(match.group(1), []).append(
+                (section.heading, ordinal, byte_offset, line, len(match.group(0).encode("utf-8")))
+            )
+    return found
+
+
+def snippet(study: CaseStudy, position: ReferencePosition, width: int = 40) -> str:
+    """Return the text around a reference position, computed on demand.
+
+    Shows the whole match plus up to ``width`` bytes of UTF-8 text
+    either side of it (a multi-byte character cut at the edge is dropped), on a single
+    line, with ellipses where the text was cut. Returns "" if the study
+    has no section at the position's ordinal with the recorded heading.
+    """
+    if not 0 <= position.ordinal < len(study.sections):
+        return ""
+    section = study.sections[position.ordinal]
+    if section.heading != position.section:
+        return ""
+    data = section.content.encode("utf-8")
+    start = max(0, position.offset - width)
+    end = min(len(data), position.offset + position.length + width)
+    text = " ".join(data[start:end].decode("utf-8", errors="ignore").split())
+    prefix = "..." if start > 0 else ""
+    suffix = "..." if end < len(data) else ""
+    return f"{prefix}{text}{suffix}"
 
 
 def build_from_studies(studies: list[CaseStudy]) -> ReferenceIndex:
@@ -85,29 +371,30 @@ def build_from_studies(studies: list[CaseStudy]) -> ReferenceIndex:
 
     Scans each study's sections for backtick-quoted repo names and
     ORGAN-N mentions, creating cross-references from the study title
-    to each discovered entity.
+    to each discovered entity. Every match is recorded in the index's
+    columnar positions; use snippet() to show the surrounding text.
     """
     index = ReferenceIndex()
 
     for study in studies:
-        full_text = "\n".join(section.content for section in study.sections)
-
-        repo_refs = extract_repo_references(full_text)
-        for repo in repo_refs:
-            index.add(CrossReference(
-                source=study.title,
-                target=repo,
-                relationship="references_repo",
-                context=f"Found in case study: {study.title}",
-            ))
+        repo_positions = _find_positions(study, REPO_PATTERN)
+        organ_positions = _find_positions(study, ORGAN_PATTERN)
+        refs = [
+            (repo, "references_repo", repo_positions[repo])
+            for repo in sorted(repo_positions)
+        ] + [
+            (f"ORGAN-{numeral}", "references_organ", organ_positions[numeral])
+            for numeral in sorted(organ_positions)
+        ]
 
-        organ_refs = extract_organ_references(full_text)
-        for organ_numeral in organ_refs:
+        for target, relationship, positions in refs:
             index.add(CrossReference(
                 source=study.title,
-                target=f"ORGAN-{organ_numeral}",
-                relationship="references_organ",
-                context=f"Found in case study: {study.title}",
+                target=target,
+                relationship=relationship,
             ))
+            ref_id = len(index.references) - 1
+            for section, ordinal, offset, line, length in positions:
+                index.positions.append(ref_id, section, ordinal, offset, line, length)
 
     return index
@@ -0,0 +1,302 @@
+"""Revalidate case studies in response to seed.yaml subscription events.
+
+Events arrive as JSON files dropped into a spool directory, e.g.::
+
+    {"event": "governance.updated", "source": "ORGAN-IV", "targets": ["ORGAN-IV"]}
+
+Producers should write to a temporary name and rename to ``*.json`` so
+half-written files are never read. Bursts of events are debounced into a
+single batch; the studies affected by a batch are found through the
+reference index, and only those are re-checked and re-exported.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import sys
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import yaml
+
+from .cross_reference import ReferenceIndex, build_from_studies
+from .export import to_evidence_checklist, to_summary
+from .parser import CaseStudy, parse_markdown
+
+REQUIRED_METADATA = ("title", "organ", "status")
+
+
+@dataclass
+class Subscription:
+    """An event this repo subscribes to, as declared in seed.yaml."""
+    event: str
+    source: str
+    action: str = ""
+
+
+@dataclass
+class Event:
+    """A received event. ``targets`` are reference targets it concerns."""
+    event: str
+    source: str = ""
+    targets: list[str] = field(default_factory=list)
+
+
+@dataclass
+class BatchResult:
+    """The outcome of processing one debounced batch of events.
+
+    Studies are identified by file name, since titles need not be unique.
+    """
+    events: list[Event] = field(default_factory=list)
+    studies: list[str] = field(default_factory=list)
+    problems: dict[str, list[str]] = field(default_factory=dict)
+
+
+def load_subscriptions(seed_path: str | Path) -> dict[str, Subscription]:
+    """Read the subscriptions block of a seed.yaml, keyed by event name."""
+    data = yaml.safe_load(Path(seed_path).read_text(encoding="utf-8")) or {}
+    return {
+        sub["event"]: Subscription(
+            event=sub["event"], source=sub.get("source", ""), action=sub.get("action", ""),
+        )
+        for sub in data.get("subscriptions", [])
+    }
+
+
+def validate_study(study: CaseStudy) -> list[str]:
+    """Return a list of problems: missing metadata or evidence sections."""
+    problems = [
+        f"missing metadata: {key}" for key in REQUIRED_METADATA if key not in study.metadata
+    ]
+    problems.extend(
+        f"missing section: {item['section']}"
+        for item in to_evidence_checklist(study)
+        if not item["present"]
+    )
+    return problems
+
+
+def affected_studies(index: ReferenceIndex, events: list[Event]) -> set[str]:
+    """Sources of references to any target of the given events.
+
+    An event without explicit targets concerns its source (e.g. ORGAN-IV).
+    """
+    sources: set[str] = set()
+    for event in events:
+        for target in event.targets or [event.source]:
+            sources.update(ref.source for ref in index.find_by_target(target))
+    return sources
+
+
+def _parse_event(data: object) -> Event:
+    """Build an Event from decoded JSON, raising ValueError if it is malformed."""
+    if not isinstance(data, dict):
+        raise ValueError("event must be a JSON object")
+    event, source, targets = data.get("event"), data.get("source", ""), data.get("targets", [])
+    if not isinstance(event, str) or not event:
+        raise ValueError("'event' must be a non-empty string")
+    if not isinstance(source, str):
+        raise ValueError("'source' must be a string")
+    if not isinstance(targets, list) or not all(isinstance(t, str) for t in targets):
+        raise ValueError("'targets' must be a list of strings")
+    return Event(event=event, source=source, targets=list(targets))
+
+
+class EventConsumer:
+    """Consume spooled events and revalidate the studies they affect.
+
+    Before each batch the corpus in ``directory`` is rescanned: files
+    whose size or mtime changed (or that are new) are re-parsed, deleted
+    files are dropped, and the reference index is rebuilt from per-file
+    indexes. Studies are keyed by file name. Each batch re-runs the
+    checklist, validation and summary export for affected studies on a
+    pool of at most ``workers`` threads, writing one ``<stem>.json``
+    report per study to ``output``. A study that fails to revalidate is
+    reported as a problem, not raised.
+
+    Event files taken from the spool are moved into ``spool/processing``
+    and only deleted once their batch has been processed; files left
+    there by a crash are returned to the spool on startup.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        spool: str | Path,
+        output: str | Path,
+        subscriptions: dict[str, Subscription],
+        debounce: float = 1.0,
+        poll_interval: float = 0.2,
+        max_batch: int = 1000,
+        workers: int = 4,
+    ) -> None:
+        if workers < 1:
+            raise ValueError(f"workers must be at least 1 (got {workers})")
+        if max_batch < 1:
+            raise ValueError(f"max_batch must be at least 1 (got {max_batch})")
+        self.directory = Path(directory)
+        self.spool = Path(spool)
+        self.processing = self.spool / "processing"
+        self.output = Path(output)
+        self.subscriptions = subscriptions
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.max_batch = max_batch
+        self.workers = workers
+
+        self.paths: dict[str, Path] = {}
+        self.index = ReferenceIndex()
+        # path -> ((mtime_ns, size), index of that file alone)
+        self._files: dict[Path, tuple[tuple[int, int], ReferenceIndex]] = {}
+        self._claimed: list[Path] = []
+        self.processing.mkdir(parents=True, exist_ok=True)
+        for leftover in sorted(self.processing.glob("*.json")):
+            leftover.replace(self.spool / leftover.name)
+        self.refresh()
+
+    def refresh(self) -> bool:
+        """Pick up added, changed and deleted studies. Returns True on any change."""
+        changed = False
+        current: set[Path] = set()
+        for md_file in sorted(self.directory.glob("*.md")):
+            try:
+                stat = md_file.stat()
+                stamp = (stat.st_mtime_ns, stat.st_size)
+                current.add(md_file)
+                entry = self._files.get(md_file)
+                if entry is not None and entry[0] == stamp:
+                    continue
+                study = parse_markdown(md_file.read_text(encoding="utf-8"))
+            except (OSError, UnicodeDecodeError) as e:
+                print(f"Skipping {md_file.name}: {e}", file=sys.stderr)
+                current.discard(md_file)
+                continue
+            keyed = CaseStudy(title=md_file.name, metadata=study.metadata, sections=study.sections)
+            self._files[md_file] = (stamp, build_from_studies([keyed]))
+            changed = True
+
+        for md_file in set(self._files) - current:
+            del self._files[md_file]
+            changed = True
+
+        if changed:
+            self.paths = {md_file.name: md_file for md_file in sorted(self._files)}
+            self.index = ReferenceIndex()
+            for md_file in sorted(self._files):
+                self.index.merge(self._files[md_file][1])
+        return changed
+
+    def read_spool(self, limit: int | None = None) -> list[Event]:
+        """Take up to ``limit`` event files out of the spool, oldest name first.
+
+        Files that are not valid events are renamed to ``*.rejected``;
+        events this repo does not subscribe to are deleted. Both still
+        count towards ``limit``. Accepted files are moved to the
+        processing directory until acknowledged after their batch.
+        """
+        events: list[Event] = []
+        paths = sorted(self.spool.glob("*.json"))
+        for path in paths[:limit]:
+            try:
+                event = _parse_event(json.loads(path.read_text(encoding="utf-8")))
+            except (OSError, ValueError) as e:
+                print(f"Rejected event file {path.name}: {e}", file=sys.stderr)
+                path.replace(path.with_name(path.name + ".rejected"))
+                continue
+
+            subscription = self.subscriptions.get(event.event)
+            if subscription is None:
+                path.unlink(missing_ok=True)
+                continue
+            claimed = self.processing / path.name
+            path.replace(claimed)
+            self._claimed.append(claimed)
+            if not event.source:
+                event.source = subscription.source
+            events.append(event)
+        return events
+
+    async def next_batch(self) -> list[Event]:
+        """Wait for events, then keep collecting until the spool is quiet.
+
+        The batch closes once no new event has arrived for ``debounce``
+        seconds, or when it reaches ``max_batch`` events.
+        """
+        batch: list[Event] = []
+        while not batch:
+            batch.extend(self.read_spool(self.max_batch))
+            if not batch:
+                await asyncio.sleep(self.poll_interval)
+
+        deadline = time.monotonic() + self.debounce
+        while len(batch) < self.max_batch and time.monotonic() < deadline:
+            await asyncio.sleep(self.poll_interval)
+            new = self.read_spool(self.max_batch - len(batch))
+            if new:
+                batch.extend(new)
+                deadline = time.monotonic() + self.debounce
+        return batch
+
+    def acknowledge(self) -> None:
+        """Delete the event files of every batch processed so far."""
+        for claimed in self._claimed:
+            claimed.unlink(missing_ok=True)
+        self._claimed.clear()
+
+    def revalidate(self, name: str, events: list[Event]) -> list[str]:
+        """Re-run checklist, validation and export for one study file."""
+        study = parse_markdown(self.paths[name].read_text(encoding="utf-8"))
+        problems = validate_study(study)
+        report = {
+            "summary": to_summary(study),
+            "checklist": to_evidence_checklist(study),
+            "problems": problems,
+            "events": sorted({event.event for event in events}),
+        }
+        self.output.mkdir(parents=True, exist_ok=True)
+        target = self.output / f"{self.paths[name].stem}.json"
+        target.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        return problems
+
+    async def process(self, events: list[Event]) -> BatchResult:
+        """Refresh the index, then revalidate every study affected by a batch."""
+        await asyncio.to_thread(self.refresh)
+        names = sorted(affected_studies(self.index, events) & set(self.paths))
+        semaphore = asyncio.Semaphore(self.workers)
+
+        async def run(name: str) -> list[str]:
+            async with semaphore:
+                return await asyncio.to_thread(self.revalidate, name, events)
+
+        outcomes = await asyncio.gather(*(run(name) for name in names), return_exceptions=True)
+        problems: dict[str, list[str]] = {}
+        for name, outcome in zip(names, outcomes):
+            if isinstance(outcome, Exception):
+                outcome = [f"revalidation failed: {outcome}"]
+            problems[name] = outcome
+        return BatchResult(events=events, studies=names, problems=problems)
+
+    async def run(
+        self,
+        once: bool = False,
+        on_batch: Callable[[BatchResult], None] | None = None,
+    ) -> None:
+        """Process batches until cancelled, or drain the spool once.
+
+        With ``once``, the events already spooled are processed in
+        batches of at most ``max_batch`` (at least one batch, possibly
+        empty) and the loop exits. ``on_batch`` is called with the result
+        of every batch.
+        """
+        while True:
+            batch = self.read_spool(self.max_batch) if once else await self.next_batch()
+            result = await self.process(batch)
+            self.acknowledge()
+            if on_batch is not None:
+                on_batch(result)
+            if once and not any(self.spool.glob("*.json")):
+                return
@@ -4,15 +4,21 @@ from __future__ import annotations
 
 import re
 from dataclasses import dataclass, field
+from pathlib import Path
 
 
 @dataclass
 class CaseStudySection:
-    """A section within a case study."""
+    """A section within a case study.
+
+    ``line`` is the 1-based line in the source document where the
+    content starts (1 for sections not parsed from a document).
+    """
     heading: str
     level: int
     content: str
     subsections: list[CaseStudySection] = field(default_factory=list)
+    line: int = 1
 
 
 @dataclass
@@ -42,6 +48,49 @@ class CaseStudy:
         return total
 
 
+class LazyCaseStudy(CaseStudy):
+    """A case study backed by a file, parsed on demand.
+
+    Only the frontmatter is read up front (see read_frontmatter), which is
+    enough for title, organ, status and other metadata queries. The full
+    file is read and its sections parsed the first time ``sections``,
+    ``word_count`` or ``get_section`` is used.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.metadata = read_frontmatter(self.path)
+        self.title = self.metadata.get("title", "Untitled Case Study")
+        self._sections: list[CaseStudySection] | None = None
+
+    @property
+    def sections(self) -> list[CaseStudySection]:
+        if self._sections is None:
+            text = self.path.read_text(encoding="utf-8")
+            self._sections = parse_markdown(text).sections
+        return self._sections
+
+    @sections.setter
+    def sections(self, value: list[CaseStudySection]) -> None:
+        self._sections = value
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._sections is not None
+
+    def __repr__(self) -> str:
+        return f"LazyCaseStudy(path={str(self.path)!r}, title={self.title!r})"
+
+
+def _parse_frontmatter_block(block: str) -> dict[str, str]:
+    metadata: dict[str, str] = {}
+    for line in block.strip().splitlines():
+        if ":" in line:
+            key, _, value = line.partition(":")
+            metadata[key.strip()] = value.strip()
+    return metadata
+
+
 def parse_frontmatter(text: str) -> tuple[dict[str, str], str]:
     """Extract YAML-like frontmatter from markdown text."""
     metadata: dict[str, str] = {}
@@ -50,15 +99,35 @@ def parse_frontmatter(text: str) -> tuple[dict[str, str], str]:
     if text.startswith("---"):
         parts = text.split("---", 2)
         if len(parts) >= 3:
-            for line in parts[1].strip().splitlines():
-                if ":" in line:
-                    key, _, value = line.partition(":")
-                    metadata[key.strip()] = value.strip()
+            metadata = _parse_frontmatter_block(parts[1])
             body = parts[2].strip()
 
     return metadata, body
 
 
+def read_frontmatter(path: str | Path, chunk_size: int = 512) -> dict[str, str]:
+    """Read only the frontmatter of a case study file.
+
+    Reads the file in small chunks and stops as soon as the closing
+    ``---`` is seen, so metadata queries over large corpora touch only
+    the head of each file. Returns the same metadata as parse_frontmatter.
+    """
+    with open(path, "rb") as f:
+        head = f.read(chunk_size)
+        if not head.startswith(b"---"):
+            return {}
+        start = 3
+        while (end := head.find(b"---", start)) == -1:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return {}
+            # Back up so a delimiter split across chunks is still found.
+            start = max(3, len(head) - 2)
+            head += chunk
+
+    return _parse_frontmatter_block(head[3:end].decode("utf-8"))
+
+
 def parse_markdown(text: str) -> CaseStudy:
     """Parse a markdown case study into structured data."""
     metadata, body = parse_frontmatter(text)
@@ -68,13 +137,22 @@ def parse_markdown(text: str) -> CaseStudy:
     sections: list[CaseStudySection] = []
 
     matches = list(heading_pattern.finditer(body))
+    # body is the stripped tail of text, so its last occurrence is the real one.
+    line = text.count("\n", 0, text.rfind(body)) + 1
+    pos = 0
 
     for i, match in enumerate(matches):
         level = len(match.group(1))
         heading = match.group(2).strip()
         start = match.end()
         end = matches[i + 1].start() if i + 1 < len(matches) else len(body)
-        content = body[start:end].strip()
-        sections.append(CaseStudySection(heading=heading, level=level, content=content))
+        raw = body[start:end]
+        content = raw.strip()
+        content_start = start + len(raw) - len(raw.lstrip())
+        line += body.count("\n", pos, content_start)
+        pos = content_start
+        sections.append(CaseStudySection(
+            heading=heading, level=level, content=content, line=line,
+        ))
 
     return CaseStudy(title=title, metadata=metadata, sections=sections)
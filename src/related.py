@@ -0,0 +1,118 @@
+"""Recommend related case studies by shared cross-reference targets."""
+
+from __future__ import annotations
+
+import heapq
+import math
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+from .cross_reference import ReferenceIndex
+
+METRICS = ("jaccard", "cosine")
+DEFAULT_MAX_DF = 0.5
+DEFAULT_MAX_POSTINGS = 1000
+
+
+@dataclass
+class Incidence:
+    """Sparse study x target incidence matrix.
+
+    Stored both row-wise (targets of each study) and column-wise
+    (studies referencing each target), so overlaps can be counted from
+    the inverted lists without touching pairs that share nothing.
+    """
+    studies: list[str] = field(default_factory=list)
+    targets: list[str] = field(default_factory=list)
+    rows: list[list[int]] = field(default_factory=list)
+    columns: list[list[int]] = field(default_factory=list)
+
+
+def build_incidence(index: ReferenceIndex) -> Incidence:
+    """Build the sparse incidence matrix from a reference index."""
+    study_ids: dict[str, int] = {}
+    target_ids: dict[str, int] = {}
+    seen: set[tuple[int, int]] = set()
+    incidence = Incidence()
+
+    for ref in index.references:
+        i = study_ids.get(ref.source)
+        if i is None:
+            i = study_ids[ref.source] = len(incidence.studies)
+            incidence.studies.append(ref.source)
+            incidence.rows.append([])
+        t = target_ids.get(ref.target)
+        if t is None:
+            t = target_ids[ref.target] = len(incidence.targets)
+            incidence.targets.append(ref.target)
+            incidence.columns.append([])
+        # The same target may be referenced under several relationships.
+        if (i, t) not in seen:
+            seen.add((i, t))
+            incidence.rows[i].append(t)
+            incidence.columns[t].append(i)
+
+    return incidence
+
+
+def _score(metric: str, shared: int, size_a: int, size_b: int) -> float:
+    if metric == "jaccard":
+        return shared / (size_a + size_b - shared)
+    return shared / math.sqrt(size_a * size_b)
+
+
+def related_studies(
+    index: ReferenceIndex,
+    k: int = 5,
+    metric: str = "jaccard",
+    max_df: float | None = DEFAULT_MAX_DF,
+    max_postings: int | None = DEFAULT_MAX_POSTINGS,
+) -> dict[str, list[tuple[str, float]]]:
+    """Compute the top-k most similar studies for every study in the index.
+
+    Similarity is Jaccard or cosine over the sets of referenced targets.
+    Overlaps are counted by walking each study's targets' inverted lists,
+    so work is proportional to shared references rather than all pairs.
+
+    A target shared by most studies (an organ, typically) would make that
+    walk all-pairs again, so hub targets are dropped from every study's
+    target set before scoring: those referenced by more than ``max_df``
+    (a fraction of studies) or by more than ``max_postings`` studies.
+    Targets shared by only two studies are always kept. Pass None for
+    both to score over the full sets, at quadratic cost on large corpora.
+    Ties are broken by title so results are deterministic.
+    """
+    if metric not in METRICS:
+        raise ValueError(f"unknown metric: {metric!r} (expected one of {', '.join(METRICS)})")
+
+    incidence = build_incidence(index)
+    rows = incidence.rows
+    limits = [
+        limit for limit in (
+            len(incidence.studies) * max_df if max_df is not None else None,
+            max_postings,
+        )
+        if limit is not None
+    ]
+    if limits:
+        df_limit = max(2, min(limits))
+        rows = [[t for t in row if len(incidence.columns[t]) <= df_limit] for row in rows]
+    sizes = [len(row) for row in rows]
+
+    related: dict[str, list[tuple[str, float]]] = {}
+    for i, row in enumerate(rows):
+        shared: dict[int, int] = defaultdict(int)
+        for t in row:
+            for j in incidence.columns[t]:
+                if j != i:
+                    shared[j] += 1
+
+        scored = (
+            (incidence.studies[j], _score(metric, count, sizes[i], sizes[j]))
+            for j, count in shared.items()
+        )
+        related[incidence.studies[i]] = heapq.nsmallest(
+            k, scored, key=lambda item: (-item[1], item[0])
+        )
+
+    return related
@@ -0,0 +1,378 @@
+"""Build a browsable static HTML site from a directory of case studies.
+
+The site has one page per study, an index, one page per referenced repo
+and organ, and an evidence checklist dashboard. A manifest written next
+to the pages records the content hash of every source a page was built
+from, so rebuilds only re-render pages whose sources changed.
+
+Section bodies are shown as their markdown source text, escaped and
+split into paragraphs; markdown syntax is not rendered.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import cache
+from pathlib import Path
+
+from jinja2 import DictLoader, Environment, select_autoescape
+
+from .cross_reference import CrossReference, ReferenceIndex, build_from_studies
+from .export import to_evidence_checklist, to_summary
+from .parser import CaseStudy, parse_markdown
+from .related import related_studies
+
+MANIFEST_NAME = ".site-manifest.json"
+
+TEMPLATES = {
+    "base.html": """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="UTF-8">
+<meta name="viewport" content="width=device-width, initial-scale=1.0">
+<title>{% block title %}{% endblock %} — Case Studies</title>
+<style>
+body{font-family:-apple-system,'Segoe UI',sans-serif;max-width:56rem;margin:2rem auto;padding:0 1rem;line-height:1.6;color:#222}
+nav a{margin-right:1rem}
+table{border-collapse:collapse}
+td,th{padding:.25rem .75rem;border-bottom:1px solid #ddd;text-align:left}
+.pass{color:#176b1e}.missing{color:#b3261e}
+</style>
+</head>
+<body>
+<nav><a href="{{ root }}index.html">Index</a><a href="{{ root }}checklist.html">Checklist</a></nav>
+{% block content %}{% endblock %}
+</body>
+</html>
+""",
+    "index.html": """{% extends "base.html" %}
+{% block title %}Index{% endblock %}
+{% block content %}
+<h1>Case Studies</h1>
+<table>
+<tr><th>Title</th><th>Organ</th><th>Status</th><th>Date</th><th>Words</th></tr>
+{% for study in studies %}
+<tr>
+<td><a href="studies/{{ study.slug }}.html">{{ study.title }}</a></td>
+<td>{{ study.organ }}</td><td>{{ study.status }}</td><td>{{ study.date }}</td>
+<td>{{ study.word_count }}</td>
+</tr>
+{% endfor %}
+</table>
+<h2>Organs</h2>
+<ul>{% for organ in organs %}<li><a href="organs/{{ organ }}.html">{{ organ }}</a></li>{% endfor %}</ul>
+<h2>Repositories</h2>
+<ul>{% for repo in repos %}<li><a href="repos/{{ repo }}.html">{{ repo }}</a></li>{% endfor %}</ul>
+{% endblock %}
+""",
+    "study.html": """{% extends "base.html" %}
+{% block title %}{{ title }}{% endblock %}
+{% block content %}
+<h1>{{ title }}</h1>
+<ul>{% for key, value in metadata.items() %}<li><strong>{{ key }}</strong>: {{ value }}</li>{% endfor %}</ul>
+{% for section in sections %}
+{% set h = [section.level + 1, 6]|min %}
+<h{{ h }}>{{ section.heading }}</h{{ h }}>
+{% for paragraph in section.paragraphs %}<p>{{ paragraph }}</p>
+{% endfor %}
+{% endfor %}
+<h2>Evidence Checklist</h2>
+<ul>{% for item in checklist %}
+<li class="{{ 'pass' if item.present else 'missing' }}">{{ item.section }}:
+{{ '%d words' % item.word_count if item.present else 'missing' }}</li>
+{% endfor %}</ul>
+<h2>References</h2>
+<ul>
+{% for organ in organs %}<li><a href="../organs/{{ organ }}.html">{{ organ }}</a></li>{% endfor %}
+{% for repo in repos %}<li><a href="../repos/{{ repo }}.html">{{ repo }}</a></li>{% endfor %}
+</ul>
+{% if related %}
+<h2>Related Studies</h2>
+<ul>{% for other in related %}
+<li><a href="{{ other.slug }}.html">{{ other.title }}</a> ({{ '%.2f' % other.score }})</li>
+{% endfor %}</ul>
+{% endif %}
+{% endblock %}
+""",
+    "target.html": """{% extends "base.html" %}
+{% block title %}{{ name }}{% endblock %}
+{% block content %}
+<h1>{{ name }}</h1>
+<p>Referenced by {{ studies|length }} case {{ 'study' if studies|length == 1 else 'studies' }}:</p>
+<ul>{% for study in studies %}<li><a href="../studies/{{ study.slug }}.html">{{ study.title }}</a></li>{% endfor %}</ul>
+{% endblock %}
+""",
+    "checklist.html": """{% extends "base.html" %}
+{% block title %}Evidence Checklist{% endblock %}
+{% block content %}
+<h1>Evidence Checklist</h1>
+<table>
+<tr><th>Study</th>{% for name in section_names %}<th>{{ name }}</th>{% endfor %}</tr>
+{% for row in rows %}
+<tr><td><a href="studies/{{ row.slug }}.html">{{ row.title }}</a></td>
+{% for item in row.checklist %}
+<td class="{{ 'pass' if item.present else 'missing' }}">{{ 'PASS' if item.present else 'MISSING' }}</td>
+{% endfor %}</tr>
+{% endfor %}
+</table>
+{% endblock %}
+""",
+}
+
+TEMPLATES_HASH = hashlib.sha256(json.dumps(TEMPLATES, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+@dataclass
+class Page:
+    """A page to render: its output path, template, context, and sources.
+
+    ``deps`` maps each source file the page was built from to the
+    SHA-256 of its content. ``source`` names the study file whose
+    sections are added to the context at render time, if any.
+    """
+    path: str
+    template: str
+    context: dict
+    deps: dict[str, str] = field(default_factory=dict)
+    source: str | None = None
+
+
+@dataclass
+class SiteBuild:
+    """The outcome of a site build."""
+    rendered: list[str] = field(default_factory=list)
+    skipped: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+
+
+@cache
+def _environment() -> Environment:
+    return Environment(loader=DictLoader(TEMPLATES), autoescape=select_autoescape())
+
+
+def render_page(template: str, context: dict) -> str:
+    """Render a single page. Runs in worker processes for parallel builds."""
+    return _environment().get_template(template).render(context)
+
+
+def _display_title(study: CaseStudy) -> str:
+    title = study.title
+    if len(title) >= 2 and title[0] == title[-1] and title[0] in "\"'":
+        return title[1:-1]
+    return title
+
+
+def _study_facts(name: str, data: bytes) -> dict:
+    """Everything the site needs from a study except its section bodies.
+
+    References are extracted with the file name as their source, since
+    titles need not be unique (every untitled study shares one).
+    """
+    study = parse_markdown(data.decode("utf-8"))
+    keyed = CaseStudy(title=name, metadata=study.metadata, sections=study.sections)
+    references = build_from_studies([keyed]).references
+    return {
+        "hash": hashlib.sha256(data).hexdigest(),
+        "title": _display_title(study),
+        "date": study.metadata.get("date", ""),
+        "metadata": study.metadata,
+        "summary": to_summary(study),
+        "checklist": to_evidence_checklist(study),
+        "targets": [[ref.target, ref.relationship] for ref in references],
+    }
+
+
+def scan_studies(directory: str | Path, known: dict[str, dict] | None = None) -> dict[str, dict]:
+    """Collect per-file facts for every study, keyed by file name.
+
+    Files whose content hash matches an entry in ``known`` (the facts
+    stored in a previous build's manifest) are not parsed again.
+    """
+    known = known or {}
+    facts: dict[str, dict] = {}
+    for md_file in sorted(Path(directory).glob("*.md")):
+        data = md_file.read_bytes()
+        previous = known.get(md_file.name)
+        if previous is not None and previous.get("hash") == hashlib.sha256(data).hexdigest():
+            facts[md_file.name] = previous
+        else:
+            facts[md_file.name] = _study_facts(md_file.name, data)
+    return facts
+
+
+def _sections_context(study: CaseStudy) -> list[dict]:
+    return [
+        {
+            "heading": section.heading,
+            "level": section.level,
+            "paragraphs": [p for p in section.content.split("\n\n") if p.strip()],
+        }
+        for section in study.sections
+    ]
+
+
+def plan_site(directory: str | Path, facts: dict[str, dict] | None = None) -> list[Page]:
+    """Work out the pages to render from the studies in a directory.
+
+    Pages, links and dependencies are keyed by file name. Study pages
+    carry their file in ``Page.source``; their section bodies are only
+    parsed when the page is actually rendered.
+    """
+    if facts is None:
+        facts = scan_studies(directory)
+
+    def slug(name: str) -> str:
+        return Path(name).stem
+
+    def link(name: str) -> dict:
+        return {"slug": slug(name), "title": facts[name]["title"]}
+
+    def deps(names: list[str]) -> dict[str, str]:
+        return {name: facts[name]["hash"] for name in names}
+
+    index = ReferenceIndex()
+    repos: dict[str, list[str]] = {}
+    organs: dict[str, list[str]] = {}
+    for name, study in facts.items():
+        for target, relationship in study["targets"]:
+            index.add(CrossReference(source=name, target=target, relationship=relationship))
+            targets = repos if relationship == "references_repo" else organs
+            sources = targets.setdefault(target, [])
+            if name not in sources:
+                sources.append(name)
+    # Default max_df/max_postings keep this linear; hub targets would make it all-pairs.
+    related = related_studies(index)
+
+    pages: list[Page] = []
+    all_names = list(facts)
+
+    pages.append(Page(
+        path="index.html",
+        template="index.html",
+        context={
+            "root": "",
+            "studies": [
+                {**study["summary"], **link(name), "date": study["date"]}
+                for name, study in facts.items()
+            ],
+            "repos": sorted(repos),
+            "organs": sorted(organs),
+        },
+        deps=deps(all_names),
+    ))
+
+    checklist_rows = [
+        {**link(name), "checklist": study["checklist"]} for name, study in facts.items()
+    ]
+    pages.append(Page(
+        path="checklist.html",
+        template="checklist.html",
+        context={
+            "root": "",
+            "section_names": [item["section"] for item in checklist_rows[0]["checklist"]]
+            if checklist_rows else [],
+            "rows": checklist_rows,
+        },
+        deps=deps(all_names),
+    ))
+
+    for name, study in facts.items():
+        neighbours = related.get(name, [])
+        targets = dict(study["targets"])
+        pages.append(Page(
+            path=f"studies/{slug(name)}.html",
+            template="study.html",
+            context={
+                "root": "../",
+                "title": study["title"],
+                "metadata": study["metadata"],
+                "checklist": study["checklist"],
+                "repos": sorted(t for t, rel in targets.items() if rel == "references_repo"),
+                "organs": sorted(t for t, rel in targets.items() if rel != "references_repo"),
+                "related": [{**link(other), "score": score} for other, score in neighbours],
+            },
+            deps=deps([name] + [other for other, _ in neighbours]),
+            source=name,
+        ))
+
+    for kind, targets in (("repos", repos), ("organs", organs)):
+        for target, names in sorted(targets.items()):
+            pages.append(Page(
+                path=f"{kind}/{target}.html",
+                template="target.html",
+                context={"root": "../", "name": target, "studies": [link(n) for n in names]},
+                deps=deps(names),
+            ))
+
+    return pages
+
+
+def build_site(
+    directory: str | Path,
+    output: str | Path,
+    jobs: int = 1,
+    force: bool = False,
+) -> SiteBuild:
+    """Build the site into ``output``, re-rendering only stale pages.
+
+    A page is stale if it is missing, if its dependency hashes differ
+    from the manifest of the previous build, or if the templates have
+    changed. Per-study facts are cached in the manifest too, so only
+    new or changed studies (and stale study pages) are parsed. Pages
+    left over from the previous build are removed. With ``jobs > 1``
+    pages are rendered in a pool of worker processes.
+    """
+    output = Path(output)
+    manifest_path = output / MANIFEST_NAME
+    manifest: dict = {}
+    if manifest_path.exists():
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    built = manifest.get("pages", {})
+    reusable = built if not force and manifest.get("templates") == TEMPLATES_HASH else {}
+
+    result = SiteBuild()
+    facts = scan_studies(directory, known=None if force else manifest.get("studies"))
+    pages = plan_site(directory, facts)
+    stale: list[Page] = []
+    for page in pages:
+        if reusable.get(page.path) == page.deps and (output / page.path).exists():
+            result.skipped.append(page.path)
+        else:
+            stale.append(page)
+
+    templates = [page.template for page in stale]
+    contexts = []
+    for page in stale:
+        context = page.context
+        if page.source:
+            text = (Path(directory) / page.source).read_text(encoding="utf-8")
+            context = {**context, "sections": _sections_context(parse_markdown(text))}
+        contexts.append(context)
+    if jobs > 1 and len(stale) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            rendered = list(pool.map(render_page, templates, contexts, chunksize=8))
+    else:
+        rendered = list(map(render_page, templates, contexts))
+
+    for page, html in zip(stale, rendered):
+        target = output / page.path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(html, encoding="utf-8")
+        result.rendered.append(page.path)
+
+    current = {page.path for page in pages}
+    for path in sorted(set(built) - current):
+        (output / path).unlink(missing_ok=True)
+        result.removed.append(path)
+
+    output.mkdir(parents=True, exist_ok=True)
+    manifest = {
+        "templates": TEMPLATES_HASH,
+        "pages": {page.path: page.deps for page in sorted(pages, key=lambda p: p.path)},
+        "studies": facts,
+    }
+    manifest_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    return result
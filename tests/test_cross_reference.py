@@ -1,13 +1,21 @@
 """Tests for the cross-reference module."""
 
+import pytest
+
 from src.cross_reference import (
     CrossReference,
+    PartialIndex,
     ReferenceIndex,
+    ReferencePosition,
     build_from_studies,
     extract_organ_references,
     extract_repo_references,
+    merge_partials,
+    parse_shard_spec,
+    shard_of,
+    snippet,
 )
-from src.parser import CaseStudy, CaseStudySection
+from src.parser import CaseStudy, CaseStudySection, parse_markdown
 
 
 class TestExtractRepoReferences:
@@ -179,3 +187,172 @@ class TestBuildFromStudies:
         assert index.find_by_source("Empty Study") == []
         orphans = index.get_orphan_studies([study])
         assert len(orphans) == 1
+
+
+class TestShardedAnalysis:
+    def _make_study(self, title: str, content: str) -> CaseStudy:
+        return CaseStudy(
+            title=title,
+            sections=[CaseStudySection(heading="Body", level=1, content=content)],
+        )
+
+    def test_merge_appends_references(self):
+        a = ReferenceIndex()
+        a.add(CrossReference(source="A", target="x", relationship="ref"))
+        b = ReferenceIndex()
+        b.add(CrossReference(source="B", target="x", relationship="ref"))
+        a.merge(b)
+        assert len(a.find_by_target("x")) == 2
+
+    def test_index_round_trip(self):
+        index = build_from_studies([self._make_study("A", "Uses `repo-alpha` in ORGAN-I.")])
+        restored = ReferenceIndex.from_dict(index.to_dict())
+        assert restored.references == index.references
+
+    def test_partial_round_trip(self):
+        partial = PartialIndex(shard=1, num_shards=3, root="/org", studies=["A"])
+        partial.index.add(CrossReference(source="A", target="x", relationship="ref"))
+        restored = PartialIndex.from_dict(partial.to_dict())
+        assert restored == partial
+
+    def test_parse_shard_spec(self):
+        assert parse_shard_spec("2/4") == (2, 4)
+
+    @pytest.mark.parametrize("spec", ["4/4", "-1/4", "1/0", "1", "a/b"])
+    def test_parse_shard_spec_rejects_invalid(self, spec):
+        with pytest.raises(ValueError):
+            parse_shard_spec(spec)
+
+    def test_shard_of_is_stable_and_in_range(self):
+        keys = [f"study-{i}.md" for i in range(50)]
+        assignments = [shard_of(k, 4) for k in keys]
+        assert assignments == [shard_of(k, 4) for k in keys]
+        assert set(assignments) <= {0, 1, 2, 3}
+
+    def test_merge_partials_detects_orphans_across_shards(self):
+        study_a = self._make_study("Study A", "Uses `repo-alpha`.")
+        study_b = self._make_study("Study B", "No references at all.")
+        partials = [
+            PartialIndex(shard=0, num_shards=2, studies=["Study A"],
+                         index=build_from_studies([study_a])),
+            PartialIndex(shard=1, num_shards=2, studies=["Study B"],
+                         index=build_from_studies([study_b])),
+        ]
+        index, titles = merge_partials(partials)
+        assert titles == ["Study A", "Study B"]
+        assert index.get_orphan_titles(titles) == ["Study B"]
+
+    def test_merge_partials_allows_separate_roots(self):
+        partials = [
+            PartialIndex(shard=0, num_shards=1, root="/org-a", studies=["A"]),
+            PartialIndex(shard=0, num_shards=1, root="/org-b", studies=["B"]),
+        ]
+        _, titles = merge_partials(partials)
+        assert titles == ["A", "B"]
+
+    def test_merge_partials_rejects_duplicate_shard(self):
+        partials = [PartialIndex(shard=0, num_shards=2), PartialIndex(shard=0, num_shards=2)]
+        with pytest.raises(ValueError, match="duplicate"):
+            merge_partials(partials)
+
+    def test_merge_partials_rejects_missing_shard(self):
+        partials = [PartialIndex(shard=0, num_shards=3), PartialIndex(shard=2, num_shards=3)]
+        with pytest.raises(ValueError, match="missing shards.*1/3"):
+            merge_partials(partials)
+
+    def test_merge_partials_rejects_mismatched_counts(self):
+        partials = [PartialIndex(shard=0, num_shards=2), PartialIndex(shard=1, num_shards=3)]
+        with pytest.raises(ValueError, match="shard count"):
+            merge_partials(partials)
+
+
+class TestReferencePositions:
+    TEXT = (
+        "---\ntitle: Positions\n---\n"
+        "## Background\n"
+        "Uses `repo-alpha` first.\n"
+        "Then ORGAN-II and `repo-alpha` again.\n"
+        "## Results\n"
+        "Caf\u00e9 `repo-beta` here.\n"
+    )
+
+    def _index(self):
+        study = parse_markdown(self.TEXT)
+        return study, build_from_studies([study])
+
+    def _ref_id(self, index, target):
+        return next(i for i, r in enumerate(index.references) if r.target == target)
+
+    def test_records_every_match(self):
+        _, index = self._index()
+        positions = index.locate(self._ref_id(index, "repo-alpha"))
+        assert positions == [
+            ReferencePosition(section="Background", ordinal=0, offset=5, line=5, length=12),
+            ReferencePosition(section="Background", ordinal=0, offset=43, line=6, length=12),
+        ]
+
+    def test_offsets_are_utf8_bytes(self):
+        _, index = self._index()
+        [position] = index.locate(self._ref_id(index, "repo-beta"))
+        assert position == ReferencePosition(section="Results", ordinal=1, offset=6, line=8, length=11)
+
+    def test_organ_positions(self):
+        _, index = self._index()
+        [position] = index.locate(self._ref_id(index, "ORGAN-II"))
+        assert position.section == "Background"
+        assert position.line == 6
+
+    def test_sections_are_shared_table(self):
+        _, index = self._index()
+        assert index.positions.sections == ["Background", "Results"]
+        assert len(index.positions) == 4
+
+    def test_context_is_not_stored(self):
+        _, index = self._index()
+        assert all(r.context == "" for r in index.references)
+
+    def test_snippet(self):
+        study, index = self._index()
+        [position] = index.locate(self._ref_id(index, "repo-beta"))
+        assert snippet(study, position, width=3) == "...\u00e9 `repo-beta` he..."
+
+    def test_snippet_uses_section_ordinal(self):
+        study = parse_markdown(
+            "---\ntitle: Repeats\n---\n"
+            "## Example\nplain text here without references at all.\n"
+            "## Example\nsee `repo-alpha` in use.\n"
+        )
+        index = build_from_studies([study])
+        [position] = index.locate(0)
+        assert position.ordinal == 1
+        assert snippet(study, position, width=2) == "...e `repo-alpha` i..."
+
+    def test_snippet_contains_whole_long_match(self):
+        study = parse_markdown(
+            "---\ntitle: Long\n---\n## Body\n"
+            "Built on `recursive-engine--generative-entity` from ORGAN-I.\n"
+        )
+        index = build_from_studies([study])
+        [position] = index.locate(self._ref_id(index, "recursive-engine--generative-entity"))
+        assert "`recursive-engine--generative-entity`" in snippet(study, position, width=5)
+
+    def test_snippet_unknown_section(self):
+        study, _ = self._index()
+        assert snippet(study, ReferencePosition("Missing", 0, 0, 1)) == ""
+
+    def test_positions_survive_round_trip(self):
+        _, index = self._index()
+        restored = ReferenceIndex.from_dict(index.to_dict())
+        assert restored == index
+        assert restored.locate(0) == index.locate(0)
+
+    def test_merge_remaps_positions(self):
+        _, index = self._index()
+        other = build_from_studies([CaseStudy(
+            title="Other",
+            sections=[CaseStudySection(heading="Notes", level=2, content="See `repo-gamma`.")],
+        )])
+        index.merge(other)
+        ref_id = self._ref_id(index, "repo-gamma")
+        assert index.locate(ref_id) == [ReferencePosition("Notes", 0, 4, 1, 12)]
+        assert index.positions.sections == ["Background", "Results", "Notes"]
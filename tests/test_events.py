@@ -0,0 +1,235 @@
+"""Tests for the event-driven revalidation module."""
+
+import asyncio
+import json
+import os
+
+import pytest
+
+from src.cross_reference import CrossReference, ReferenceIndex
+from src.events import (
+    Event,
+    EventConsumer,
+    Subscription,
+    affected_studies,
+    load_subscriptions,
+    validate_study,
+)
+from src.parser import CaseStudy, CaseStudySection
+
+SUBSCRIPTIONS = {
+    "governance.updated": Subscription(event="governance.updated", source="ORGAN-IV"),
+    "theory.published": Subscription(event="theory.published", source="ORGAN-I"),
+}
+
+
+def _corpus(tmp_path):
+    source = tmp_path / "studies"
+    source.mkdir()
+    (source / "a.md").write_text(
+        "---\ntitle: Study A\norgan: II\nstatus: published\n---\n"
+        "## Background\nBuilt on ORGAN-I theory with `repo-alpha`.\n",
+        encoding="utf-8",
+    )
+    (source / "b.md").write_text(
+        "---\ntitle: Study B\n---\n## Background\nGoverned by ORGAN-IV.\n",
+        encoding="utf-8",
+    )
+    spool = tmp_path / "spool"
+    spool.mkdir()
+    return source, spool, tmp_path / "out"
+
+
+def _spool(spool, name, event):
+    (spool / name).write_text(json.dumps(event), encoding="utf-8")
+
+
+class TestLoadSubscriptions:
+    def test_reads_seed(self, tmp_path):
+        seed = tmp_path / "seed.yaml"
+        seed.write_text(
+            "subscriptions:\n"
+            "  - event: theory.published\n"
+            "    source: ORGAN-I\n"
+            "    action: Check for art derivative opportunities\n",
+            encoding="utf-8",
+        )
+        subs = load_subscriptions(seed)
+        assert subs["theory.published"].source == "ORGAN-I"
+
+    def test_missing_block(self, tmp_path):
+        seed = tmp_path / "seed.yaml"
+        seed.write_text("organ: II\n", encoding="utf-8")
+        assert load_subscriptions(seed) == {}
+
+
+class TestAffectedStudies:
+    def _index(self):
+        index = ReferenceIndex()
+        index.add(CrossReference(source="A", target="ORGAN-I", relationship="references_organ"))
+        index.add(CrossReference(source="B", target="repo-x", relationship="references_repo"))
+        return index
+
+    def test_falls_back_to_source(self):
+        assert affected_studies(self._index(), [Event("theory.published", "ORGAN-I")]) == {"A"}
+
+    def test_explicit_targets(self):
+        event = Event("governance.updated", "ORGAN-IV", targets=["repo-x"])
+        assert affected_studies(self._index(), [event]) == {"B"}
+
+
+class TestValidateStudy:
+    def test_reports_missing_metadata_and_sections(self):
+        study = CaseStudy(
+            title="T",
+            metadata={"title": "T"},
+            sections=[CaseStudySection(heading="Background", level=2, content="x")],
+        )
+        problems = validate_study(study)
+        assert "missing metadata: organ" in problems
+        assert "missing section: Results" in problems
+        assert "missing section: Background" not in problems
+
+
+class TestEventConsumer:
+    def test_once_revalidates_only_affected(self, tmp_path):
+        source, spool, output = _corpus(tmp_path)
+        _spool(spool, "001.json", {"event": "theory.published"})
+        consumer = EventConsumer(source, spool, output, SUBSCRIPTIONS)
+        results = []
+        asyncio.run(consumer.run(once=True, on_batch=results.append))
+        assert results[0].studies == ["a.md"]
+        report = json.loads((output / "a.md").with_suffix(".json").read_text(encoding="utf-8"))
+        assert report["events"] == ["theory.published"]
+        assert not (output / "b.json").exists()
+        assert list(spool.glob("*.json")) == []
+        assert list((spool / "processing").iterdir()) == []
+
+    def test_drops_unsubscribed_and_rejects_malformed(self, tmp_path):
+        source, spool, output = _corpus(tmp_path)
+        _spool(spool, "001.json", {"event": "unrelated.event"})
+        (spool / "002.json").write_text("not json", encoding="utf-8")
+        consumer = EventConsumer(source, spool, output, SUBSCRIPTIONS)
+        assert consumer.read_spool() == []
+        assert [p.name for p in spool.glob("*.json*")] == ["002.json.rejected"]
+
+    def test_burst_is_debounced_into_one_batch(self, tmp_path):
+        source, spool, output = _corpus(tmp_path)
+        consumer = EventConsumer(
+            source, spool, output, SUBSCRIPTIONS, debounce=0.1, poll_interval=0.01,
+        )
+
+        async def scenario():
+            batch = asyncio.create_task(consumer.next_batch())
+            _spool(spool, "001.json", {"event": "theory.published"})
+            await asyncio.sleep(0.03)
+            _spool(spool, "002.json", {"event": "governance.updated"})
+            events = await batch
+            return await consumer.process(events)
+
+        result = asyncio.run(scenario())
+        assert [e.event for e in result.events] == ["theory.published", "governance.updated"]
+        assert result.studies == ["a.md", "b.md"]
+        assert "missing metadata: organ" in result.problems["b.md"]
+
+    def test_edited_and_added_studies_are_picked_up(self, tmp_path):
+        source, spool, output = _corpus(tmp_path)
+        consumer = EventConsumer(source, spool, output, SUBSCRIPTIONS)
+        (source / "b.md").write_text(
+            "---\ntitle: Study B\n---\n## Background\nNow cites ORGAN-I as well as ORGAN-IV.\n",
+            encoding="utf-8",
+        )
+        (source / "c.md").write_text(
+            "---\ntitle: Study C\n---\n## Background\nNew study on ORGAN-I.\n", encoding="utf-8",
+        )
+        # Make sure the edit is visible even on filesystems with coarse mtimes.
+        stat = (source / "b.md").stat()
+        os.utime(source / "b.md", ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        result = asyncio.run(consumer.process([Event("theory.published", "ORGAN-I")]))
+        assert result.studies == ["a.md", "b.md", "c.md"]
+
+    def test_deleted_study_is_dropped(self, tmp_path):
+        source, spool, output = _corpus(tmp_path)
+        consumer = EventConsumer(source, spool, output, SUBSCRIPTIONS)
+        (source / "a.md").unlink()
+        result = asyncio.run(consumer.process([Event("theory.published", "ORGAN-I")]))
+        assert result.studies == []
+
+    def test_failing_study_is_reported_not_raised(self, tmp_path):
+        source, spool, output = _corpus(tmp_path)
+        consumer = EventConsumer(source, spool, output, SUBSCRIPTIONS)
+        original = consumer.revalidate
+
+        def revalidate(name, events):
+            if name == "a.md":
+                raise FileNotFoundError("a.md vanished")
+            return original(name, events)
+
+        consumer.revalidate = revalidate
+        events = [Event("theory.published", "ORGAN-I"), Event("governance.updated", "ORGAN-IV")]
+        result = asyncio.run(consumer.process(events))
+        assert result.problems["a.md"] == ["revalidation failed: a.md vanished"]
+        assert "missing metadata: organ" in result.problems["b.md"]
+
+    @pytest.mark.parametrize("event", [
+        {"event": ["governance.updated"]},
+        {"event": "governance.updated", "source": 4},
+        {"event": "governance.updated", "targets": "ORGAN-IV"},
+        {"event": "governance.updated", "targets": [["ORGAN-IV"]]},
+        ["governance.updated"],
+    ])
+    def test_rejects_mistyped_fields(self, tmp_path, event):
+        source, spool, output = _corpus(tmp_path)
+        _spool(spool, "001.json", event)
+        consumer = EventConsumer(source, spool, output, SUBSCRIPTIONS)
+        assert consumer.read_spool() == []
+        assert [p.name for p in spool.glob("*.json*")] == ["001.json.rejected"]
+
+    def test_events_are_kept_until_their_batch_is_processed(self, tmp_path):
+        source, spool, output = _corpus(tmp_path)
+        _spool(spool, "001.json", {"event": "theory.published"})
+        consumer = EventConsumer(source, spool, output, SUBSCRIPTIONS)
+        assert len(consumer.read_spool()) == 1
+        assert [p.name for p in (spool / "processing").iterdir()] == ["001.json"]
+
+        # A consumer restarted before acknowledging picks the event up again.
+        restarted = EventConsumer(source, spool, output, SUBSCRIPTIONS)
+        assert [p.name for p in spool.glob("*.json")] == ["001.json"]
+        assert len(restarted.read_spool()) == 1
+        restarted.acknowledge()
+        assert list((spool / "processing").iterdir()) == []
+
+    def test_studies_sharing_a_title_are_all_revalidated(self, tmp_path):
+        source, spool, output = _corpus(tmp_path)
+        (source / "c.md").write_text(
+            "---\ntitle: Study A\n---\n## Background\nAlso about ORGAN-I.\n",
+            encoding="utf-8",
+        )
+        consumer = EventConsumer(source, spool, output, SUBSCRIPTIONS)
+        result = asyncio.run(consumer.process([Event("theory.published", "ORGAN-I")]))
+        assert result.studies == ["a.md", "c.md"]
+        assert (output / "a.json").exists()
+        assert (output / "c.json").exists()
+
+    def test_read_spool_respects_limit(self, tmp_path):
+        source, spool, output = _corpus(tmp_path)
+        for i in range(5):
+            _spool(spool, f"{i:03}.json", {"event": "theory.published"})
+        consumer = EventConsumer(source, spool, output, SUBSCRIPTIONS, max_batch=2)
+        assert len(consumer.read_spool(2)) == 2
+        assert len(list(spool.glob("*.json"))) == 3
+
+    def test_once_drains_spool_in_capped_batches(self, tmp_path):
+        source, spool, output = _corpus(tmp_path)
+        for i in range(5):
+            _spool(spool, f"{i:03}.json", {"event": "theory.published"})
+        consumer = EventConsumer(source, spool, output, SUBSCRIPTIONS, max_batch=2)
+        results = []
+        asyncio.run(consumer.run(once=True, on_batch=results.append))
+        assert [len(r.events) for r in results] == [2, 2, 1]
+
+    @pytest.mark.parametrize("kwargs", [{"workers": 0}, {"workers": -1}, {"max_batch": 0}])
+    def test_rejects_invalid_limits(self, tmp_path, kwargs):
+        source, spool, output = _corpus(tmp_path)
+        with pytest.raises(ValueError):
+            EventConsumer(source, spool, output, SUBSCRIPTIONS, **kwargs)
@@ -1,6 +1,13 @@
 """Tests for the case study parser."""
 
-from src.parser import CaseStudy, CaseStudySection, parse_frontmatter, parse_markdown
+from src.parser import (
+    CaseStudy,
+    CaseStudySection,
+    LazyCaseStudy,
+    parse_frontmatter,
+    parse_markdown,
+    read_frontmatter,
+)
 
 
 class TestParseFrontmatter:
@@ -147,3 +154,55 @@ class TestCaseStudyProperties:
             ],
         )
         assert study.word_count == 5
+
+
+class TestSectionLines:
+    def test_lines_point_into_source(self):
+        text = "---\ntitle: Lines\n---\n\n# First\n\nAlpha.\n\n## Second\nBeta.\n"
+        study = parse_markdown(text)
+        lines = text.splitlines()
+        assert [s.line for s in study.sections] == [7, 10]
+        assert [lines[s.line - 1] for s in study.sections] == ["Alpha.", "Beta."]
+
+    def test_lines_without_frontmatter(self):
+        study = parse_markdown("# Only\nText.")
+        assert study.sections[0].line == 2
+
+
+class TestLazyCaseStudy:
+    def _write(self, tmp_path, text: str):
+        path = tmp_path / "study.md"
+        path.write_text(text, encoding="utf-8")
+        return path
+
+    def test_read_frontmatter_matches_parse_frontmatter(self, tmp_path):
+        text = '---\ntitle: "Key: Value"\norgan: II\nstatus: published\n---\n# Body\nText.'
+        path = self._write(tmp_path, text)
+        assert read_frontmatter(path) == parse_frontmatter(text)[0]
+
+    def test_read_frontmatter_stops_at_closing_delimiter(self, tmp_path):
+        path = self._write(tmp_path, "---\ntitle: Test\n---\n" + "x" * 100_000)
+        assert read_frontmatter(path, chunk_size=8) == {"title": "Test"}
+
+    def test_read_frontmatter_without_frontmatter(self, tmp_path):
+        path = self._write(tmp_path, "# Just a heading\nText.")
+        assert read_frontmatter(path) == {}
+
+    def test_read_frontmatter_missing_close(self, tmp_path):
+        path = self._write(tmp_path, "---\ntitle: Test\nNo closing delimiter.")
+        assert read_frontmatter(path, chunk_size=4) == {}
+
+    def test_metadata_without_parsing_sections(self, tmp_path):
+        path = self._write(tmp_path, "---\ntitle: Lazy\norgan: II\n---\n# Results\nOne two three.")
+        study = LazyCaseStudy(path)
+        assert study.title == "Lazy"
+        assert study.organ == "II"
+        assert study.status == "draft"
+        assert not study.is_loaded
+
+    def test_sections_parsed_on_first_use(self, tmp_path):
+        path = self._write(tmp_path, "---\ntitle: Lazy\n---\n# Results\nOne two three.")
+        study = LazyCaseStudy(path)
+        assert study.word_count == 3
+        assert study.is_loaded
+        assert study.get_section("Results").content == "One two three."
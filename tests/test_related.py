@@ -0,0 +1,75 @@
+"""Tests for the related-studies module."""
+
+import pytest
+
+from src.cross_reference import CrossReference, ReferenceIndex
+from src.related import build_incidence, related_studies
+
+
+def _index(graph: dict[str, list[str]]) -> ReferenceIndex:
+    index = ReferenceIndex()
+    for source, targets in graph.items():
+        for target in targets:
+            index.add(CrossReference(source=source, target=target, relationship="ref"))
+    return index
+
+
+class TestBuildIncidence:
+    def test_rows_and_columns_agree(self):
+        incidence = build_incidence(_index({"A": ["x", "y"], "B": ["y"]}))
+        assert incidence.studies == ["A", "B"]
+        assert incidence.targets == ["x", "y"]
+        assert incidence.rows == [[0, 1], [1]]
+        assert incidence.columns == [[0], [0, 1]]
+
+    def test_deduplicates_relationships(self):
+        index = ReferenceIndex()
+        index.add(CrossReference(source="A", target="x", relationship="ref1"))
+        index.add(CrossReference(source="A", target="x", relationship="ref2"))
+        incidence = build_incidence(index)
+        assert incidence.rows == [[0]]
+        assert incidence.columns == [[0]]
+
+
+class TestRelatedStudies:
+    def test_jaccard_scores(self):
+        related = related_studies(_index({"A": ["x", "y"], "B": ["y", "z"], "C": ["q"]}))
+        assert related["A"] == [("B", pytest.approx(1 / 3))]
+        assert related["C"] == []
+
+    def test_cosine_scores(self):
+        related = related_studies(_index({"A": ["x"], "B": ["x", "y"]}), metric="cosine")
+        assert related["A"][0][1] == pytest.approx(1 / 2 ** 0.5)
+
+    def test_top_k_ordering_and_ties(self):
+        index = _index({"A": ["x", "y"], "B": ["x", "y"], "C": ["x"], "D": ["x"]})
+        related = related_studies(index, k=2, max_df=None, max_postings=None)
+        assert related["A"] == [("B", 1.0), ("C", 0.5)]
+
+    def test_default_drops_target_shared_by_every_study(self):
+        index = _index({"A": ["hub", "x"], "B": ["hub", "x"], "C": ["hub"], "D": ["hub"]})
+        related = related_studies(index)
+        assert related["A"] == [("B", 1.0)]
+        assert related["C"] == []
+
+    def test_max_postings_caps_hub_targets(self):
+        graph = {f"S{i}": ["hub"] for i in range(10)}
+        graph.update({"A": ["hub", "x"], "B": ["hub", "x"]})
+        related = related_studies(_index(graph), max_df=None, max_postings=5)
+        assert related["A"] == [("B", 1.0)]
+
+    def test_max_df_skips_common_targets(self):
+        index = _index({"A": ["hub", "x"], "B": ["hub", "x"], "C": ["hub"]})
+        related = related_studies(index, max_df=0.7)
+        assert [title for title, _ in related["A"]] == ["B"]
+        assert related["C"] == []
+
+    def test_max_df_scores_over_filtered_sets(self):
+        index = _index({"A": ["hub", "x"], "B": ["hub", "x"], "C": ["hub"]})
+        for metric in ("jaccard", "cosine"):
+            related = related_studies(index, metric=metric, max_df=0.7)
+            assert related["A"] == [("B", pytest.approx(1.0))]
+
+    def test_unknown_metric(self):
+        with pytest.raises(ValueError):
+            related_studies(ReferenceIndex(), metric="euclidean")
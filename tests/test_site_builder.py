@@ -0,0 +1,146 @@
+"""Tests for the static site builder."""
+
+import json
+
+from src import site_builder
+from src.site_builder import MANIFEST_NAME, build_site, plan_site
+
+STUDY_A = """---
+title: Study A
+organ: II
+status: published
+---
+## Background
+Uses `repo-alpha` within ORGAN-II.
+"""
+
+STUDY_B = """---
+title: Study B
+organ: I
+---
+## Results
+Also uses `repo-alpha` from ORGAN-I.
+"""
+
+STUDY_C = """---
+title: Study C
+---
+## Methodology
+Stands alone with `repo-gamma`.
+"""
+
+
+def _corpus(tmp_path):
+    source = tmp_path / "studies"
+    source.mkdir()
+    (source / "a.md").write_text(STUDY_A, encoding="utf-8")
+    (source / "b.md").write_text(STUDY_B, encoding="utf-8")
+    (source / "c.md").write_text(STUDY_C, encoding="utf-8")
+    return source, tmp_path / "site"
+
+
+class TestPlanSite:
+    def test_pages(self, tmp_path):
+        source, _ = _corpus(tmp_path)
+        paths = {page.path for page in plan_site(source)}
+        assert {"index.html", "checklist.html", "studies/a.html", "studies/b.html",
+                "studies/c.html", "repos/repo-alpha.html", "repos/repo-gamma.html",
+                "organs/ORGAN-I.html", "organs/ORGAN-II.html"} == paths
+
+    def test_study_page_depends_on_related_studies(self, tmp_path):
+        source, _ = _corpus(tmp_path)
+        pages = {page.path: page for page in plan_site(source)}
+        assert set(pages["studies/a.html"].deps) == {"a.md", "b.md"}
+        assert set(pages["studies/c.html"].deps) == {"c.md"}
+        assert set(pages["repos/repo-alpha.html"].deps) == {"a.md", "b.md"}
+        assert pages["studies/a.html"].source == "a.md"
+
+
+class TestBuildSite:
+    def test_full_build(self, tmp_path):
+        source, output = _corpus(tmp_path)
+        result = build_site(source, output)
+        assert len(result.rendered) == 9
+        assert result.skipped == []
+        assert (output / "studies" / "a.html").exists()
+        assert "Study B" in (output / "repos" / "repo-alpha.html").read_text(encoding="utf-8")
+        manifest = json.loads((output / MANIFEST_NAME).read_text(encoding="utf-8"))
+        assert set(manifest["pages"]) == {*result.rendered}
+
+    def test_rebuild_without_changes_renders_nothing(self, tmp_path):
+        source, output = _corpus(tmp_path)
+        build_site(source, output)
+        result = build_site(source, output)
+        assert result.rendered == []
+        assert len(result.skipped) == 9
+
+    def test_rebuild_renders_only_affected_pages(self, tmp_path):
+        source, output = _corpus(tmp_path)
+        build_site(source, output)
+        (source / "c.md").write_text(STUDY_C + "\nMore words.\n", encoding="utf-8")
+        result = build_site(source, output)
+        assert set(result.rendered) == {
+            "index.html", "checklist.html", "studies/c.html", "repos/repo-gamma.html",
+        }
+
+    def test_removed_study_pages_are_deleted(self, tmp_path):
+        source, output = _corpus(tmp_path)
+        build_site(source, output)
+        (source / "c.md").unlink()
+        result = build_site(source, output)
+        assert set(result.removed) == {"studies/c.html", "repos/repo-gamma.html"}
+        assert not (output / "studies" / "c.html").exists()
+
+    def test_force_renders_everything(self, tmp_path):
+        source, output = _corpus(tmp_path)
+        build_site(source, output)
+        result = build_site(source, output, force=True)
+        assert len(result.rendered) == 9
+
+    def test_parallel_build_matches_serial(self, tmp_path):
+        source, output = _corpus(tmp_path)
+        build_site(source, output)
+        serial = (output / "studies" / "a.html").read_text(encoding="utf-8")
+        build_site(source, tmp_path / "parallel", jobs=2)
+        parallel = (tmp_path / "parallel" / "studies" / "a.html").read_text(encoding="utf-8")
+        assert parallel == serial
+
+    def test_deep_headings_are_clamped(self, tmp_path):
+        source, output = _corpus(tmp_path)
+        (source / "d.md").write_text("---\ntitle: D\n---\n###### Deep\nText.\n", encoding="utf-8")
+        build_site(source, output)
+        html = (output / "studies" / "d.html").read_text(encoding="utf-8")
+        assert "<h6>Deep</h6>" in html
+        assert "<h7" not in html
+
+    def test_duplicate_titles_are_keyed_by_file(self, tmp_path):
+        source = tmp_path / "untitled"
+        source.mkdir()
+        (source / "a.md").write_text("## Background\nCites `repo-a`.\n", encoding="utf-8")
+        (source / "b.md").write_text("## Background\nCites `repo-b`.\n", encoding="utf-8")
+        output = tmp_path / "site"
+        build_site(source, output)
+        repo_b = (output / "repos" / "repo-b.html").read_text(encoding="utf-8")
+        assert "studies/b.html" in repo_b
+        assert "studies/a.html" not in repo_b
+        assert "repo-b" not in (output / "studies" / "a.html").read_text(encoding="utf-8")
+
+        (source / "b.md").write_text("## Background\nCites `repo-b` again.\n", encoding="utf-8")
+        result = build_site(source, output)
+        assert "repos/repo-b.html" in result.rendered
+        assert "repos/repo-a.html" not in result.rendered
+
+    def test_unchanged_studies_are_not_reparsed(self, tmp_path, monkeypatch):
+        source, output = _corpus(tmp_path)
+        build_site(source, output)
+        (source / "c.md").write_text(STUDY_C + "\nMore words.\n", encoding="utf-8")
+        parsed = []
+        original = site_builder._study_facts
+
+        def record(name, data):
+            parsed.append(name)
+            return original(name, data)
+
+        monkeypatch.setattr(site_builder, "_study_facts", record)
+        build_site(source, output)
+        assert parsed == ["c.md"]